@@ -50,29 +50,61 @@ Schimbări față de 1.0:
 import sys
 import os
 import re
+import math
 import threading
+import time
 import traceback
-from typing import List, Dict, Any, Optional, Tuple
+import multiprocessing
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from collections import deque
+from copy import copy
+from itertools import chain, islice
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from queue import Queue, Empty
 
+import numpy as np
+import pandas as pd
 from openpyxl import load_workbook, Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
+from openpyxl.utils.dataframe import dataframe_to_rows
 
 # --------------------------- Utilities ---------------------------
 
+# Consolidated rows are held column-wise: canonical header -> one value per row
+Columns = Dict[str, List[Any]]
+
+# Canonical column names, interned: they key every row dict and column list
+_NR_CRT = sys.intern('Nr. crt')
+_SHEET = sys.intern('Sheet')
+_DESCRIERE = sys.intern('Descriere')
+_DENUMIRE = sys.intern('Denumire')
+_COD = sys.intern('Cod articol')
+_FURNIZOR = sys.intern('Furnizor')
+_CANTITATE = sys.intern('Cantitate')
+_PU = sys.intern('P.U.\n(RON)')
+_TOT = sys.intern('Pret total\n(RON)')
+_TPU = sys.intern('P.U. Taxa\nVerde (RON)')
+_TTOT = sys.intern('Pret total Taxa\nVerde (RON)')
+_STOC = sys.intern('Stoc')
+_COD_STOC = sys.intern('Cod - Stoc')
+
+_WS_RE = re.compile(r"\s+")
+# EU decimal comma: digits, comma, digits at the end of the string
+_EU_DECIMAL_RE = re.compile(r"\d,\d+$")
+
 def to_float(x: Any) -> Optional[float]:
     """Parse numbers from EU and US formats, return None on failure."""
     if x is None or x == "":
         return None
     if isinstance(x, (int, float)):
         return float(x)
-    s = str(x).strip().replace("\xa0", " ")
-    s = re.sub(r"\s+", "", s)
-    # EU decimal comma
-    if re.search(r"\d+,\d+$", s):
+    s = _WS_RE.sub("", str(x))
+    if _EU_DECIMAL_RE.search(s):
         s = s.replace(".", "").replace(",", ".")
     else:
         s = s.replace(",", "")
@@ -81,6 +113,16 @@ def to_float(x: Any) -> Optional[float]:
     except ValueError:
         return None
 
+def to_float_series(values: pd.Series) -> pd.Series:
+    """Column-wise to_float: same parsing rules, NaN where to_float returns None."""
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values.astype(float)
+    s = values.astype(str).str.replace(_WS_RE, "", regex=True)
+    eu = s.str.contains(_EU_DECIMAL_RE, na=False)
+    s = s.str.replace(",", "", regex=False).where(
+        ~eu, s.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    return pd.to_numeric(s, errors="coerce").astype(float)
+
 class ExcelProcessingCancelled(Exception):
     pass
 
@@ -313,8 +355,8 @@ class ExcelProcessorGUI:
     # ---------------- UI plumbing ----------------
 
     def _set_status(self, msg: str):
-        self.status_label.config(text=msg)
-        self.root.update_idletasks()
+        # applied by _poll_ui_queue, in order with worker updates; no forced event-loop flush
+        self.ui_queue.put(("status", msg))
 
     def _poll_ui_queue(self):
         try:
@@ -354,30 +396,46 @@ class ExcelProcessor:
         self.progress = progress_cb
 
         self.common_headers = [
-            'Nr. crt', 'Sheet', 'Descriere', 'Denumire', 'Cod articol', 'Furnizor',
-            'Cantitate', 'P.U.\n(RON)', 'Pret total\n(RON)',
-            'P.U. Taxa\nVerde (RON)', 'Pret total Taxa\nVerde (RON)'
+            _NR_CRT, _SHEET, _DESCRIERE, _DENUMIRE, _COD, _FURNIZOR,
+            _CANTITATE, _PU, _TOT, _TPU, _TTOT
         ]
         self.centralizator_headers = [
-            'Descriere', 'Denumire', 'Cod articol', 'Furnizor', 'Cantitate',
-            'P.U.\n(RON)', 'Pret total\n(RON)',
-            'P.U. Taxa\nVerde (RON)', 'Pret total Taxa\nVerde (RON)', 'Stoc', 'Cod - Stoc'
+            _DESCRIERE, _DENUMIRE, _COD, _FURNIZOR, _CANTITATE,
+            _PU, _TOT, _TPU, _TTOT, _STOC, _COD_STOC
         ]
+        self._header_index: Dict[str, int] = {h: i for i, h in enumerate(self.common_headers)}
         self.source_sheets: List[Dict[str, str]] = []
         self.stock_data: Dict[str, float] = {}
-        self._stock_exact: Dict[str, float] = {}
-        self._stock_by_suffix: Dict[str, List[Tuple[str, float]]] = {}
+        # normalized code (or fuzzy suffix) -> (stock quantity, original stock code)
+        self._stock_index: Dict[str, Tuple[float, str]] = {}
+        self._progress_max = 0
+        self._pending_inc = 0
+        self._last_flush = time.monotonic()
 
     # --------------- Progress helpers ---------------
 
     def _progress_init(self, max_units: int):
+        self._progress_max = max_units
+        self._pending_inc = 0
+        self._last_flush = time.monotonic()
         self.progress("init", max_units)
 
     def _progress_add_max(self, delta: int):
+        self._progress_max += delta
         self.progress("add_max", delta)
 
     def _progress_inc(self, step: int = 1):
-        self.progress("inc", step)
+        # batched: post once the pending delta reaches ~1% of the bar or 100 ms have passed
+        self._pending_inc += step
+        if (self._pending_inc >= max(1, self._progress_max // 100)
+                or time.monotonic() - self._last_flush >= 0.1):
+            self._progress_flush()
+
+    def _progress_flush(self):
+        if self._pending_inc:
+            self.progress("inc", self._pending_inc)
+            self._pending_inc = 0
+        self._last_flush = time.monotonic()
 
     def _check_cancel(self):
         if self.cancel_event.is_set():
@@ -386,94 +444,85 @@ class ExcelProcessor:
     # --------------- Stock helpers ---------------
 
     @staticmethod
+    @lru_cache(maxsize=65536)
     def _normalize_code(s: Any) -> str:
+        # article codes recur across files and sheets; memoized
         return "".join(str(s).strip().upper().split())
 
     def _build_stock_index(self):
-        self._stock_exact = {self._normalize_code(k): v for k, v in self.stock_data.items()}
-        self._stock_by_suffix.clear()
-        for k, v in self.stock_data.items():
-            nk = self._normalize_code(k)
-            suf = nk[-6:] if len(nk) >= 6 else nk
-            self._stock_by_suffix.setdefault(suf, []).append((nk, v))
+        self._stock_index = {}
+        if not self.stock_data:
+            return
+        # _normalize_code for all keys in one column pass; object dtype keeps Python's
+        # Unicode-aware \s, matching str.split()
+        keys = list(self.stock_data.keys())
+        norm = pd.Series(keys, dtype=object).str.upper().str.replace(_WS_RE, "", regex=True).tolist()
+        exact: Dict[str, float] = {}
+        norm_to_original: Dict[str, str] = {}
+        suffixes: Dict[str, Tuple[str, float]] = {}
+        for k, nk in zip(keys, norm):
+            v = self.stock_data[k]
+            exact[nk] = v
+            # first original code wins when several normalize to the same key
+            norm_to_original.setdefault(nk, k)
+            # every terminal suffix of >= 6 chars, so fuzzy "endswith" matching is a dict hit
+            for i in range(len(nk) - 5):
+                suffixes.setdefault(nk[i:], (nk, v))
+
+        # resolve both answers up front; exact matches take precedence over suffixes
+        self._stock_index = {sfx: (v, norm_to_original[nk]) for sfx, (nk, v) in suffixes.items()}
+        self._stock_index.update((nk, (v, norm_to_original[nk])) for nk, v in exact.items())
+
+    def lookup_stock(self, cod_articol: str) -> Tuple[float, str]:
+        """Stock quantity and original stock code matching an article code, or (0.0, "")."""
+        if not cod_articol or not self._stock_index:
+            return 0.0, ""
+        return self._stock_index.get(self._normalize_code(cod_articol), (0.0, ""))
 
     def find_stock_quantity(self, cod_articol: str) -> float:
-        if not cod_articol or not self.stock_data:
-            return 0.0
-        key = self._normalize_code(cod_articol)
-        if key in self._stock_exact:
-            return self._stock_exact[key]
-        bucket = self._stock_by_suffix.get(key[-6:] if len(key) >= 6 else key, [])
-        for nk, v in bucket:
-            if nk.endswith(key) or f" {key} " in f" {nk} ":
-                return v
-        return 0.0
+        return self.lookup_stock(cod_articol)[0]
 
     def find_stock_code(self, cod_articol: str) -> str:
         """Find and return the original stock code that matches the given article code."""
-        if not cod_articol or not self.stock_data:
-            return ""
-        key = self._normalize_code(cod_articol)
-        
-        # Check exact match first - return the original key from stock_data
-        for original_stock_code in self.stock_data.keys():
-            if self._normalize_code(original_stock_code) == key:
-                return original_stock_code
-        
-        # Fuzzy matching - return the original stock code that matches
-        bucket = self._stock_by_suffix.get(key[-6:] if len(key) >= 6 else key, [])
-        for nk, v in bucket:
-            if nk.endswith(key) or f" {key} " in f" {nk} ":
-                # Find the original stock code that corresponds to this normalized key
-                for original_stock_code in self.stock_data.keys():
-                    if self._normalize_code(original_stock_code) == nk:
-                        return original_stock_code
-        return ""
+        return self.lookup_stock(cod_articol)[1]
 
     # --------------- Main pipeline ---------------
 
     def process_files(self, file_paths: List[str], output_file: str):
         self._check_cancel()
-        consolidated_data: List[Dict[str, Any]] = []
-        row_counter = 1
+        consolidated_data = self._new_columns()
         self.source_sheets.clear()
 
         # Initial progress estimate: per file step + stock + write sheets + copy sheets later
         self._progress_init(max_units=max(10, len(file_paths) + 4))
 
         try:
-            for i, file_path in enumerate(file_paths, 1):
-                self._check_cancel()
-                self.status(f"Processing file {i}/{len(file_paths)}: {os.path.basename(file_path)}")
-                file_data, sheets_info = self._extract_data_from_file(file_path)
-
+            stock_rows = None
+            for i, (file_data, sheets_info, file_stock_rows) in enumerate(self._extract_all_files(file_paths)):
+                if i == 0:
+                    stock_rows = file_stock_rows
                 # store sheet refs for later copy (name + path only)
                 self.source_sheets.extend(sheets_info)
 
                 # accumulate consolidated rows
-                for row in file_data:
-                    row['Nr. crt'] = row_counter
-                    consolidated_data.append(row)
-                    row_counter += 1
+                self._extend_columns(consolidated_data, file_data)
 
-                self._progress_inc(1)
-
-            if not consolidated_data:
+            n_rows = len(consolidated_data[_NR_CRT])
+            if not n_rows:
                 raise ValueError("No data was extracted from the files.")
+            consolidated_data[_NR_CRT] = list(range(1, n_rows + 1))
 
             # Now we know how many sheets to copy; add to progress maximum
             self._progress_add_max(len(self.source_sheets))
 
-            # Stock extraction from first file with suitable sheet
+            # Stock from the first file's stock sheet, captured during extraction
             self._check_cancel()
             self.status("Extracting stock data...")
-            try:
-                wb_tmp = load_workbook(file_paths[0], data_only=True)
-                self.stock_data = self._extract_stock_data(wb_tmp)
-                wb_tmp.close()
-            except Exception as e:
-                self.status(f"Stock extraction warning: {e}")
+            if stock_rows is None:
+                self.status("No 'Stoc' sheet found. Stock defaults to 0.")
                 self.stock_data = {}
+            else:
+                self.stock_data = self._extract_stock_data_from_rows(stock_rows)
 
             self._build_stock_index()
             self._progress_inc(1)
@@ -486,55 +535,107 @@ class ExcelProcessor:
         except:
             # ensure we propagate after cleanup
             raise
+        finally:
+            self._progress_flush()
 
     # --------------- Extraction ---------------
 
-    def _extract_data_from_file(self, file_path: str):
-        data: List[Dict[str, Any]] = []
+    def _new_columns(self) -> Columns:
+        return {h: [] for h in self.common_headers}
+
+    @staticmethod
+    def _extend_columns(dst: Columns, src: Columns):
+        for h, values in src.items():
+            dst[h].extend(values)
+
+    def _extract_all_files(self, file_paths: List[str]) -> List[Tuple[Columns, List[Dict[str, str]], Optional[List[Tuple]]]]:
+        """Extract every file, in parallel worker processes when there is more than one.
+
+        Results are returned in input order so row numbering stays deterministic.
+        Stock rows are only captured for the first file.
+        """
+        n = len(file_paths)
+        workers = min(n, max(1, (os.cpu_count() or 1) - 1))
+        results: List[Any] = [None] * n
+
+        if workers <= 1:
+            for i, file_path in enumerate(file_paths):
+                self._check_cancel()
+                self.status(f"Processing file {i + 1}/{n}: {os.path.basename(file_path)}")
+                results[i] = self._extract_data_from_file(file_path, with_stock=(i == 0))
+                self._progress_inc(1)
+            return results
+
+        # processes rather than threads: openpyxl holds the GIL while parsing XML
+        self.status(f"Processing {n} files in {workers} worker processes...")
+        ex = ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = {ex.submit(_extract_file_worker, p, i == 0): i for i, p in enumerate(file_paths)}
+            for done, fut in enumerate(as_completed(futures), 1):
+                self._check_cancel()
+                i = futures[fut]
+                results[i] = fut.result()
+                self.status(f"Processed file {done}/{n}: {os.path.basename(file_paths[i])}")
+                self._progress_inc(1)
+        finally:
+            ex.shutdown(wait=True, cancel_futures=True)
+        return results
+
+    def _extract_data_from_file(self, file_path: str, with_stock: bool = False
+                                ) -> Tuple[Columns, List[Dict[str, str]], Optional[List[Tuple]]]:
+        """Extract item rows from every sheet; with_stock also returns the stock sheet's
+        raw rows (None if the file has none), saving a separate load for stock."""
+        data = self._new_columns()
+        stock_rows: Optional[List[Tuple]] = None
         sheets_info: List[Dict[str, str]] = []
         wb_data = None
-        wb_orig = None
         try:
-            wb_data = load_workbook(file_path, data_only=True)
-            wb_orig = load_workbook(file_path, data_only=False)
+            wb_data = load_workbook(file_path, data_only=True, read_only=True)
 
             for sheet_name in wb_data.sheetnames:
                 self._check_cancel()
                 sh = wb_data[sheet_name]
-                extracted = self._extract_data_from_sheet(sh, sheet_name)
-
-                for row in extracted:
-                    row['Sheet'] = sheet_name
-                data.extend(extracted)
+                # read-only iteration stops at the stored <dimension>, which generated
+                # exports often write undersized (or as just A1); scan the real extent
+                sh.reset_dimensions()
+                self._extend_columns(data, self._extract_data_from_sheet(sh, sheet_name))
+                if with_stock and stock_rows is None and str(sheet_name).lower() in self._STOCK_SHEET_NAMES:
+                    stock_rows = list(sh.iter_rows(values_only=True))
 
                 sheets_info.append({'name': sheet_name, 'file_path': file_path})
         except Exception as e:
             raise ValueError(f"Error reading '{os.path.basename(file_path)}': {e}")
         finally:
-            # try/finally cleanup
-            try:
-                if wb_data:
-                    wb_data.close()
-            finally:
-                if wb_orig:
-                    wb_orig.close()
-        return data, sheets_info
+            # try/finally cleanup; formatted sheets are reopened on demand at copy time
+            if wb_data:
+                wb_data.close()
+        return data, sheets_info, stock_rows
+
+    _HEADER_INDICATORS = ('nr', 'crt', 'descriere', 'denumire', 'cod', 'furnizor', 'cantitate')
+
+    def _extract_data_from_sheet(self, sheet, sheet_name: str) -> Columns:
+        data = self._new_columns()
 
-    def _extract_data_from_sheet(self, sheet, sheet_name: str) -> List[Dict[str, Any]]:
-        data: List[Dict[str, Any]] = []
+        # single streaming pass; rows may differ in length, so never index past len(row)
+        rows = sheet.iter_rows(values_only=True)
 
         # header row detection
         header_row = None
-        for r in range(1, min(25, sheet.max_row + 1)):
-            vals = []
-            for c in range(1, min(15, sheet.max_column + 1)):
-                v = sheet.cell(r, c).value
-                if v:
-                    vals.append(str(v).strip().lower())
-            indicators = ['nr', 'crt', 'descriere', 'denumire', 'cod', 'furnizor', 'cantitate']
-            matches = sum(1 for ind in indicators if any(ind in cell for cell in vals))
+        header_vals: Tuple[Any, ...] = ()
+        for r, row in enumerate(islice(rows, 24), start=1):
+            # cells joined with a separator no indicator contains, so "in" still tests per cell
+            text = "\0".join(str(v).strip().lower() for v in row[:14] if v)
+            if not text:
+                continue
+            matches = 0
+            for ind in self._HEADER_INDICATORS:
+                if ind in text:
+                    matches += 1
+                    if matches >= 3:
+                        break
             if matches >= 3:
                 header_row = r
+                header_vals = row
                 break
 
         if not header_row:
@@ -543,133 +644,124 @@ class ExcelProcessor:
 
         # header mapping
         header_map: Dict[int, str] = {}
-        for c in range(1, sheet.max_column + 1):
-            raw = sheet.cell(header_row, c).value
+        for c, raw in enumerate(header_vals, 1):
             if raw:
                 mapped = self._map_header(str(raw))
                 if mapped:
                     header_map[c] = mapped
 
+        # (source index, common_headers index) per mapped column, in source order
+        col_to_canon = [(c - 1, self._header_index[h]) for c, h in header_map.items()]
+        columns = [data[h] for h in self.common_headers]
+        width = len(columns)
+        sheet_idx = self._header_index[_SHEET]
+
         # extract rows
         extracted = 0
-        for r in range(header_row + 1, sheet.max_row + 1):
+        for r, row in enumerate(rows, start=header_row + 1):
             if r % 50 == 0:
                 self._check_cancel()
-            row_data: Dict[str, Any] = {}
+            # headers missing from this sheet stay None
+            vals: List[Any] = [None] * width
             has_data = False
-            for c in range(1, sheet.max_column + 1):
-                if c in header_map:
-                    val = sheet.cell(r, c).value
-                    row_data[header_map[c]] = val
-                    if val is not None and str(val).strip():
-                        has_data = True
-
-            if has_data and self._is_valid_item_row(row_data):
-                # ensure all known headers exist (except 'Sheet')
-                for h in self.common_headers:
-                    if h != 'Sheet' and h not in row_data:
-                        row_data[h] = None
-                data.append(row_data)
+            n = len(row)
+            for src_i, tgt_i in col_to_canon:
+                val = row[src_i] if src_i < n else None
+                vals[tgt_i] = val
+                if val is not None and str(val).strip():
+                    has_data = True
+
+            if has_data and self._classify_row(vals):
+                vals[sheet_idx] = sheet_name
+                for values, val in zip(columns, vals):
+                    values.append(val)
                 extracted += 1
 
         return data
 
+    # (pattern, canonical header); first match wins
+    _HEADER_PATTERNS: List[Tuple["re.Pattern[str]", str]] = [
+        (re.compile(r'nr\. crt|nr crt|numar crt|nr\.crt'), _NR_CRT),
+        (re.compile(r'descriere|description'), _DESCRIERE),
+        (re.compile(r'denumire|denomination|nume'), _DENUMIRE),
+        (re.compile(r'cod articol|cod art|article code|cod produs|code'), _COD),
+        (re.compile(r'furnizor|supplier|provider'), _FURNIZOR),
+        (re.compile(r'cantitate|qty|quantity|cant'), _CANTITATE),
+        # green (taxa verde) variants precede the base ones
+        (re.compile(r'^(?=.*(?:taxa|verde)).*(?:p\.u\.|pret unitar|unit price)'), _TPU),
+        (re.compile(r'^(?=.*(?:taxa|verde)).*total'), _TTOT),
+        (re.compile(r'p\.u\.|pret unitar|unit price'), _PU),
+        (re.compile(r'pret total|total price'), _TOT),
+    ]
+
     def _map_header(self, header_text: str) -> Optional[str]:
         h = header_text.lower().strip().replace('\n', ' ')
-        if any(p in h for p in ['nr. crt', 'nr crt', 'numar crt', 'nr.crt']):
-            return 'Nr. crt'
-        if any(p in h for p in ['descriere', 'description']):
-            return 'Descriere'
-        if any(p in h for p in ['denumire', 'denomination', 'nume']):
-            return 'Denumire'
-        if any(p in h for p in ['cod articol', 'cod art', 'article code', 'cod produs', 'code']):
-            return 'Cod articol'
-        if any(p in h for p in ['furnizor', 'supplier', 'provider']):
-            return 'Furnizor'
-        if any(p in h for p in ['cantitate', 'qty', 'quantity', 'cant']):
-            return 'Cantitate'
-        # unit price non-green
-        if (('p.u.' in h or 'pret unitar' in h or 'unit price' in h)
-                and 'taxa' not in h and 'verde' not in h):
-            return 'P.U.\n(RON)'
-        # total non-green
-        if (('pret total' in h or 'total price' in h)
-                and 'taxa' not in h and 'verde' not in h):
-            return 'Pret total\n(RON)'
-        # unit price green
-        if (('p.u.' in h or 'pret unitar' in h) and ('taxa' in h or 'verde' in h)):
-            return 'P.U. Taxa\nVerde (RON)'
-        # total green
-        if (('pret total' in h or 'total' in h) and ('taxa' in h or 'verde' in h)):
-            return 'Pret total Taxa\nVerde (RON)'
+        for pattern, target in self._HEADER_PATTERNS:
+            if pattern.search(h):
+                return target
         return None
 
-    def _is_total_row(self, row: Dict[str, Any]) -> bool:
-        d = row.get('Descriere', '')
-        if isinstance(d, str):
-            dl = d.lower().strip()
-            for k in ['total', 'suma', 'subtotal', 'total materiale', 'total general', 'sumă', 'sumar', 'consolidat']:
-                if k in dl or dl == k:
-                    return True
-        return False
-
-    def _is_header_row(self, row: Dict[str, Any]) -> bool:
-        descr = str(row.get('Descriere', '')).lower().strip()
-        if any(k in descr for k in ['descriere', 'denumire', 'description']):
-            return True
-        other = [str(row.get(x, '')).lower().strip() for x in ['Denumire', 'Cod articol', 'Furnizor']]
-        patterns = ['denumire', 'cod articol', 'furnizor', 'cantitate', 'p.u.', 'pret total']
-        matches = sum(1 for val in [descr] + other if any(p in val for p in patterns))
-        return matches >= 2
-
-    def _is_valid_item_row(self, row: Dict[str, Any]) -> bool:
-        descr = row.get('Descriere', '')
-        if not descr or not str(descr).strip():
+    _TOTAL_KEYWORDS = ('total', 'suma', 'subtotal', 'total materiale', 'total general', 'sumă', 'sumar', 'consolidat')
+    _HEADER_WORDS = ('descriere', 'denumire', 'description')
+    _HEADER_ROW_PATTERNS = ('denumire', 'cod articol', 'furnizor', 'cantitate', 'p.u.', 'pret total')
+    _EMPTY_MARKERS = ('none', 'n/a', '-')
+
+    def _classify_row(self, vals: List[Any]) -> bool:
+        """True for a real item row (values aligned to common_headers): has a description,
+        is not a repeated header or a total, and has at least 2 meaningful fields.
+        Each field is normalized once."""
+        idx = self._header_index
+        raw_descr = vals[idx[_DESCRIERE]]
+        if not raw_descr:
+            return False
+        d = str(raw_descr).strip().lower()
+        if not d:
+            return False
+
+        def norm(key: str) -> str:
+            v = vals[idx[key]]
+            return '' if v is None else str(v).strip().lower()
+
+        den, cod, furn, cant = norm(_DENUMIRE), norm(_COD), norm(_FURNIZOR), norm(_CANTITATE)
+
+        # repeated header row
+        if any(k in d for k in self._HEADER_WORDS):
             return False
-        if self._is_header_row(row):
+        if sum(1 for val in (d, den, cod, furn) if any(p in val for p in self._HEADER_ROW_PATTERNS)) >= 2:
             return False
-        if self._is_total_row(row):
+        # total row
+        if any(k in d for k in self._TOTAL_KEYWORDS):
             return False
         # require at least 2 meaningful fields
-        fields = ['Descriere', 'Denumire', 'Cod articol', 'Furnizor', 'Cantitate']
-        count = 0
-        for f in fields:
-            v = row.get(f, '')
-            if v is not None and str(v).strip() and str(v).strip().lower() not in ['none', 'n/a', '-']:
-                count += 1
-        return count >= 2
+        return sum(1 for val in (d, den, cod, furn, cant) if val and val not in self._EMPTY_MARKERS) >= 2
 
     # --------------- Stock ---------------
 
-    def _extract_stock_data(self, workbook) -> Dict[str, float]:
+    # case-insensitive stock sheet names
+    _STOCK_SHEET_NAMES = {"stoc", "stock", "inventory"}
+
+    def _extract_stock_data_from_rows(self, stock_rows: Iterable[Tuple]) -> Dict[str, float]:
         stock: Dict[str, float] = {}
 
         try:
-            # case-insensitive sheet match
-            stoc_name = next((n for n in workbook.sheetnames if str(n).lower() in {"stoc", "stock", "inventory"}), None)
-            if not stoc_name:
-                self.status("No 'Stoc' sheet found. Stock defaults to 0.")
-                return {}
-            ws = workbook[stoc_name]
+            rows = iter(stock_rows)
 
             # find header row
             header_row = None
-            for r in range(1, min(15, ws.max_row + 1)):
-                row_text = " ".join(
-                    str(ws.cell(r, c).value).lower()
-                    for c in range(1, min(15, ws.max_column + 1))
-                    if ws.cell(r, c).value is not None
-                )
+            header_vals: Tuple[Any, ...] = ()
+            for r, row in enumerate(islice(rows, 14), start=1):
+                row_text = " ".join(str(v).lower() for v in row[:14] if v is not None)
                 if any(k in row_text for k in ['cod', 'stoc', 'total', 'valoare']):
                     header_row = r
+                    header_vals = row
                     break
             if not header_row:
                 return {}
 
             cod_col = None
             stoc_col = None
-            for c in range(1, ws.max_column + 1):
-                v = str(ws.cell(header_row, c).value or '').lower()
+            for c, raw in enumerate(header_vals, 1):
+                v = str(raw or '').lower()
                 if 'cod' in v:
                     cod_col = c
                 if 'stoc' in v or 'total final' in v:
@@ -678,8 +770,14 @@ class ExcelProcessor:
             if not cod_col or not stoc_col:
                 # fallback guess: first col code, first numeric col is stock
                 cod_col = cod_col or 1
-                for c in range(2, min(10, ws.max_column + 1)):
-                    sample = ws.cell(header_row + 1, c).value
+                sample_row = next(rows, None)
+                if sample_row is not None:
+                    # put the peeked row back in front of the data rows
+                    rows = chain([sample_row], rows)
+                else:
+                    sample_row = ()
+                for c in range(2, min(9, len(sample_row)) + 1):
+                    sample = sample_row[c - 1]
                     if sample is not None:
                         try:
                             float(sample)
@@ -691,9 +789,9 @@ class ExcelProcessor:
             if not cod_col or not stoc_col:
                 return {}
 
-            for r in range(header_row + 1, ws.max_row + 1):
-                code = ws.cell(r, cod_col).value
-                qty = ws.cell(r, stoc_col).value
+            for row in rows:
+                code = row[cod_col - 1] if cod_col <= len(row) else None
+                qty = row[stoc_col - 1] if stoc_col <= len(row) else None
                 if code and qty is not None:
                     fqty = to_float(qty)
                     if fqty is not None:
@@ -705,313 +803,425 @@ class ExcelProcessor:
 
     # --------------- Aggregation ---------------
 
-    def _create_centralizator_data(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        from collections import defaultdict
-        grouped = defaultdict(list)
-        items_without_code_grouped = defaultdict(list)  # Group items without codes by description
-        
-        for it in rows:
-            code = str(it.get('Cod articol', '') or '').strip()
-            if code:
-                grouped[code].append(it)
-            else:
-                # Group items without code by their description/name
-                desc = str(it.get('Descriere', '') or '').strip()
-                if desc:
-                    items_without_code_grouped[desc].append(it)
-                else:
-                    # If no description either, use denomination
-                    denom = str(it.get('Denumire', '') or '').strip()
-                    key = denom if denom else "NO_IDENTIFIER"
-                    items_without_code_grouped[key].append(it)
-
-        out: List[Dict[str, Any]] = []
-        
-        # Helper function for weighted average
-        def wavg(pairs: List[Tuple[float, float]]) -> float:
-            total_q = sum(q for _, q in pairs)
-            return round(sum(p * q for p, q in pairs) / total_q, 6) if total_q else 0.0
-        
-        # Process grouped items (with codes)
-        for code, items in grouped.items():
-            sum_qty = 0.0
-            sum_total = 0.0
-            sum_tax_total = 0.0
-            pu_pairs: List[Tuple[float, float]] = []
-            tpu_pairs: List[Tuple[float, float]] = []
-
-            base = items[0]
-
-            for it in items:
-                q = to_float(it.get('Cantitate')) or 0.0
-                pu = to_float(it.get('P.U.\n(RON)'))
-                tot = to_float(it.get('Pret total\n(RON)'))
-                tpu = to_float(it.get('P.U. Taxa\nVerde (RON)'))
-                ttot = to_float(it.get('Pret total Taxa\nVerde (RON)'))
-
-                sum_qty += q
-                sum_total += (tot if tot is not None else ((pu or 0.0) * q))
-                sum_tax_total += (ttot if ttot is not None else ((tpu or 0.0) * q))
-                if pu is not None:
-                    pu_pairs.append((pu, q))
-                if tpu is not None:
-                    tpu_pairs.append((tpu, q))
-
-            p_u = wavg(pu_pairs)
-            p_u_taxa = wavg(tpu_pairs)
+    _NUMERIC_HEADERS = (_CANTITATE, _PU, _TOT, _TPU, _TTOT)
+
+    @classmethod
+    def _parse_numeric(cls, cols: Columns) -> Dict[str, np.ndarray]:
+        """Parse the quantity and price columns to floats once (NaN where unparseable).
+
+        Shared by the Cumulative total fallback and the Centralizator aggregation.
+        """
+        # object dtype keeps raw cell values (None stays None, no string inference)
+        return {h: to_float_series(pd.Series(cols[h], dtype=object)).to_numpy(dtype=float)
+                for h in cls._NUMERIC_HEADERS}
+
+    def _create_centralizator_data(self, cols: Columns, nums: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """One row per group, in centralizator_headers column order.
+
+        Columns are object dtype so every cell keeps a plain Python value.
+        """
+        n_rows = len(cols[_DESCRIERE])
+        if not n_rows:
+            return pd.DataFrame(columns=self.centralizator_headers, dtype=object)
+
+        # object dtype keeps raw cell values (None stays None, no string inference)
+        def column(col: str) -> pd.Series:
+            return pd.Series(cols[col], dtype=object)
+
+        def text(col: str) -> pd.Series:
+            return column(col).map(lambda v: str(v or '').strip())
+
+        # Items with a code group by code; the rest by description, then denomination
+        code = text(_COD)
+        desc = text(_DESCRIERE)
+        denom = text(_DENUMIRE)
+        has_code = code != ''
+        key = code.where(has_code, desc.where(desc != '', denom.where(denom != '', 'NO_IDENTIFIER')))
+
+        # group ids in order of first appearance; the tag keeps a code from ever
+        # sharing a group with an identical description
+        group_ids, tagged = pd.factorize(('C' + key).where(has_code, 'D' + key), sort=False)
+        n_groups = len(tagged)
+        firsts = np.unique(group_ids, return_index=True)[1]
+        # rows ordered by group, cut into one contiguous segment per group
+        order = np.argsort(group_ids, kind='stable')
+        ends = np.cumsum(np.bincount(group_ids, minlength=n_groups)).tolist()
+        segments = list(zip([0] + ends[:-1], ends))
+
+        def group_sum(weights: np.ndarray) -> List[float]:
+            # exact per-group sums; naive accumulation drifts on long money columns
+            w = weights[order].tolist()
+            return [math.fsum(w[a:b]) for a, b in segments]
+
+        q = np.nan_to_num(nums[_CANTITATE])
+        pu = nums[_PU]
+        tot = nums[_TOT]
+        tpu = nums[_TPU]
+        ttot = nums[_TTOT]
+
+        sums_qty = group_sum(q)
+        sums_total = group_sum(np.where(np.isnan(tot), np.nan_to_num(pu) * q, tot))
+        sums_tax_total = group_sum(np.where(np.isnan(ttot), np.nan_to_num(tpu) * q, ttot))
+        # weighted unit prices only count rows where the price is present
+        pu_w = group_sum(np.nan_to_num(pu * q))
+        pu_q = group_sum(np.where(np.isnan(pu), 0.0, q))
+        tpu_w = group_sum(np.nan_to_num(tpu * q))
+        tpu_q = group_sum(np.where(np.isnan(tpu), 0.0, q))
+
+        # emit groups already ordered by (code, description); uncoded groups sort
+        # with an empty code, and ties keep their first-appearance order
+        descriptions = cols[_DESCRIERE]
+        group_codes = [tag[1:] if tag[0] == 'C' else '' for tag in tagged]
+        order = sorted(range(n_groups), key=lambda g: (group_codes[g], descriptions[firsts[g]]))
+
+        out: List[List[Any]] = []
+        for g in order:
+            first = firsts[g]
+            # uncoded groups have an empty code, which never matches stock
+            stock_qty, stock_code = self.lookup_stock(group_codes[g])
+            sum_qty = float(sums_qty[g])
+            p_u = round(float(pu_w[g] / pu_q[g]), 6) if pu_q[g] else 0.0
+            p_u_taxa = round(float(tpu_w[g] / tpu_q[g]), 6) if tpu_q[g] else 0.0
 
             # convert qty to int if whole
-            qty_val = int(sum_qty) if abs(sum_qty - int(sum_qty)) < 1e-9 else round(sum_qty, 6)
-
-            stock_qty = self.find_stock_quantity(code)
-            stock_code = self.find_stock_code(code)
-
-            out.append({
-                'Descriere': base.get('Descriere', ''),
-                'Denumire': base.get('Denumire', ''),
-                'Cod articol': code,
-                'Furnizor': base.get('Furnizor', ''),
-                'Cantitate': qty_val,
-                'P.U.\n(RON)': p_u,
-                'Pret total\n(RON)': round(sum_total, 6),
-                'P.U. Taxa\nVerde (RON)': p_u_taxa,
-                'Pret total Taxa\nVerde (RON)': round(sum_tax_total, 6),
-                'Stoc': stock_qty,
-                'Cod - Stoc': stock_code
-            })
-        
-        # Process grouped items without codes (aggregated by description/name)
-        for desc_key, items in items_without_code_grouped.items():
-            sum_qty = 0.0
-            sum_total = 0.0
-            sum_tax_total = 0.0
-            pu_pairs: List[Tuple[float, float]] = []
-            tpu_pairs: List[Tuple[float, float]] = []
-
-            base = items[0]
-
-            for it in items:
-                q = to_float(it.get('Cantitate')) or 0.0
-                pu = to_float(it.get('P.U.\n(RON)'))
-                tot = to_float(it.get('Pret total\n(RON)'))
-                tpu = to_float(it.get('P.U. Taxa\nVerde (RON)'))
-                ttot = to_float(it.get('Pret total Taxa\nVerde (RON)'))
-
-                sum_qty += q
-                sum_total += (tot if tot is not None else ((pu or 0.0) * q))
-                sum_tax_total += (ttot if ttot is not None else ((tpu or 0.0) * q))
-                if pu is not None:
-                    pu_pairs.append((pu, q))
-                if tpu is not None:
-                    tpu_pairs.append((tpu, q))
-
-            p_u = wavg(pu_pairs)
-            p_u_taxa = wavg(tpu_pairs)
-
-            # convert qty to int if whole
-            qty_val = int(sum_qty) if abs(sum_qty - int(sum_qty)) < 1e-9 else round(sum_qty, 6)
-
-            out.append({
-                'Descriere': base.get('Descriere', ''),
-                'Denumire': base.get('Denumire', ''),
-                'Cod articol': '',  # Empty since no code
-                'Furnizor': base.get('Furnizor', ''),
-                'Cantitate': qty_val,
-                'P.U.\n(RON)': p_u,
-                'Pret total\n(RON)': round(sum_total, 6),
-                'P.U. Taxa\nVerde (RON)': p_u_taxa,
-                'Pret total Taxa\nVerde (RON)': round(sum_tax_total, 6),
-                'Stoc': 0.0,  # No stock match possible without code
-                'Cod - Stoc': ''  # No stock code match possible without code
-            })
-
-        out.sort(key=lambda x: (x.get('Cod articol', ''), x.get('Descriere', '')))
-        return out
+            qty_val = int(sum_qty) if sum_qty.is_integer() else round(sum_qty, 6)
+
+            # same order as centralizator_headers
+            out.append([
+                descriptions[first],
+                cols[_DENUMIRE][first],
+                group_codes[g],
+                cols[_FURNIZOR][first],
+                qty_val,
+                p_u,
+                round(float(sums_total[g]), 6),
+                p_u_taxa,
+                round(float(sums_tax_total[g]), 6),
+                stock_qty,
+                stock_code,
+            ])
+        return pd.DataFrame(out, columns=self.centralizator_headers, dtype=object)
 
     # --------------- Workbook creation ---------------
 
-    def _create_consolidated_workbook(self, data: List[Dict[str, Any]], output_file: str):
-        from copy import copy
-
+    def _create_consolidated_workbook(self, data: Columns, output_file: str):
         self._check_cancel()
         self.status("Writing sheets...")
 
-        wb = Workbook()
+        # write-only: rows are streamed to the output instead of held as a cell grid
+        wb = Workbook(write_only=True)
         try:
+            nums = self._parse_numeric(data)
+
             # Cumulative
-            ws_cum = wb.active
-            ws_cum.title = "Cumulative"
-            self._write_cumulative(ws_cum, data)
+            ws_cum = wb.create_sheet(title="Cumulative")
+            self._write_cumulative(ws_cum, data, nums)
             self._progress_inc(1)
 
             # Centralizator
-            ws_cen = wb.create_sheet(title="Centralizator", index=1)
-            cen_data = self._create_centralizator_data(data)
+            ws_cen = wb.create_sheet(title="Centralizator")
+            cen_data = self._create_centralizator_data(data, nums)
             self._write_centralizator(ws_cen, cen_data)
             self._progress_inc(1)
 
-            # Copy original sheets
-            for i, sh in enumerate(self.source_sheets, 1):
-                self._check_cancel()
-                src_path = sh['file_path']
+            # Copy original sheets; destination sheets are created up front so their
+            # order does not depend on which source file finishes loading first
+            groups: Dict[str, List[Tuple[str, Any]]] = {}
+            used = set(wb.sheetnames)
+            suffixes: Dict[str, int] = {}
+            for sh in self.source_sheets:
                 src_name = sh['name']
 
-                # ensure unique name
-                base_name = src_name
-                unique = base_name
-                idx = 1
-                while unique in wb.sheetnames:
-                    idx += 1
-                    unique = f"{base_name}_{idx}"
+                # ensure unique name; suffixes continue from the last one taken per name
+                unique = src_name
+                while unique in used:
+                    suffixes[src_name] = suffixes.get(src_name, 1) + 1
+                    unique = f"{src_name}_{suffixes[src_name]}"
+                used.add(unique)
 
                 ws_new = wb.create_sheet(title=unique)
-                # reopen source workbook on demand
-                wbs = load_workbook(src_path, data_only=False)
-                try:
-                    src_ws = wbs[src_name]
-                    self._copy_sheet_content(src_ws, ws_new)
-                finally:
-                    wbs.close()
+                groups.setdefault(sh['file_path'], []).append((src_name, ws_new))
 
-                self._progress_inc(1)
-                self.status(f"Copied sheet {i}/{len(self.source_sheets)}: {src_name}")
+            if groups:
+                self._copy_source_sheets(groups)
 
             # Save
             self._check_cancel()
+            self._save_workbook(wb, output_file)
+        finally:
+            wb.close()
+
+    def _save_workbook(self, wb, output_file: str):
+        """Save on a helper thread so status and cancellation stay live meanwhile.
+
+        openpyxl cannot abandon a save halfway: a cancel during the save waits for
+        it to finish, then removes the file it wrote.
+        """
+        errors: List[BaseException] = []
+
+        def save():
             try:
                 wb.save(output_file)
-            except PermissionError as e:
-                raise PermissionError(f"Cannot write '{output_file}': {e}")
+            except BaseException as e:
+                errors.append(e)
+
+        saver = threading.Thread(target=save, daemon=True)
+        started = time.monotonic()
+        shown = -1
+        saver.start()
+        while saver.is_alive():
+            saver.join(0.1)
+            elapsed = int(time.monotonic() - started)
+            if elapsed != shown:
+                shown = elapsed
+                self.status("Cancelling, finishing save..." if self.cancel_event.is_set()
+                            else f"Saving... ({elapsed}s)")
+
+        if errors:
+            if isinstance(errors[0], PermissionError):
+                raise PermissionError(f"Cannot write '{output_file}': {errors[0]}")
+            raise errors[0]
+        if self.cancel_event.is_set():
+            try:
+                os.remove(output_file)
+            except OSError:
+                pass
+            raise ExcelProcessingCancelled()
+
+    # output styles: one shared instance per distinct style, assigned to every cell
+    _HDR_FONT = Font(bold=True, size=11)
+    _HDR_ALIGN = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    _BORDER_THIN = Border(left=Side(style='thin'), right=Side(style='thin'),
+                          top=Side(style='thin'), bottom=Side(style='thin'))
+    _HDR_FILL_YELLOW = PatternFill(start_color="FFFFFF00", end_color="FFFFFF00", fill_type="solid")
+    _HDR_FILL_BLUE = PatternFill(start_color="FFCCE5FF", end_color="FFCCE5FF", fill_type="solid")
+    _HDR_FILL_GREEN = PatternFill(start_color="FF90EE90", end_color="FF90EE90", fill_type="solid")
+    _FILL_COD = PatternFill(start_color="FFF0F8FF", end_color="FFF0F8FF", fill_type="solid")
+    _FILL_COD_STOC = PatternFill(start_color="FFE6F3FF", end_color="FFE6F3FF", fill_type="solid")
+
+    _MONEY_HEADERS = (_PU, _TOT, _TPU, _TTOT)
+    # number-format modes per output column, compared as ints in the row hot path
+    _FMT_NONE, _FMT_QTY, _FMT_MONEY = 0, 1, 2
+
+    @staticmethod
+    def _style_template(ws, **attrs):
+        """Resolve a style combination to its style array once, for reuse across cells."""
+        cell = WriteOnlyCell(ws)
+        for name, value in attrs.items():
+            setattr(cell, name, value)
+        return cell._style
+
+    def _header_row(self, ws, headers: List[str], fills: List[PatternFill]) -> List[WriteOnlyCell]:
+        """Header cells; each distinct fill is resolved to a style array once."""
+        styles: Dict[int, Any] = {}
+        cells = []
+        for h, fill in zip(headers, fills):
+            style = styles.get(id(fill))
+            if style is None:
+                style = styles[id(fill)] = self._style_template(
+                    ws, font=self._HDR_FONT, fill=fill, alignment=self._HDR_ALIGN, border=self._BORDER_THIN)
+            cell = WriteOnlyCell(ws, value=h)
+            cell._style = copy(style)
+            cells.append(cell)
+        return cells
+
+    def _column_styles(self, ws, headers: List[str], qty_headers: Tuple[str, ...],
+                       fills: Optional[Dict[str, PatternFill]] = None) -> List[Tuple[int, Any, Any]]:
+        """Per column: (format mode, style without number format, style with number format)."""
+        fills = fills or {}
+        styles = []
+        for h in headers:
+            base: Dict[str, Any] = {'border': self._BORDER_THIN}
+            if h in fills:
+                base['fill'] = fills[h]
+            plain = self._style_template(ws, **base)
+            if h in qty_headers:
+                styles.append((self._FMT_QTY, plain, self._style_template(ws, number_format='#,##0', **base)))
+            elif h in self._MONEY_HEADERS:
+                styles.append((self._FMT_MONEY, plain, self._style_template(ws, number_format='#,##0.00', **base)))
+            else:
+                styles.append((self._FMT_NONE, plain, plain))
+        return styles
+
+    @classmethod
+    def _styled_row(cls, ws, vals: Iterable[Any], col_styles: List[Tuple[int, Any, Any]]) -> List[WriteOnlyCell]:
+        new_cell = WriteOnlyCell
+        fmt_none, fmt_qty = cls._FMT_NONE, cls._FMT_QTY
+        cells = []
+        append = cells.append
+        for val, (mode, plain, formatted) in zip(vals, col_styles):
+            cell = new_cell(ws, value=val)
+            if (mode != fmt_none and isinstance(val, (int, float))
+                    and (mode == fmt_qty or val != 0)):
+                cell._style = copy(formatted)
+            else:
+                cell._style = copy(plain)
+            append(cell)
+        return cells
+
+    def _load_source_workbook(self, src_path: str):
+        self._check_cancel()
+        # external link parts are never copied, so skip parsing them
+        return load_workbook(src_path, data_only=False, keep_links=False)
+
+    def _copy_source_sheets(self, groups: Dict[str, List[Tuple[str, Any]]]):
+        """Copy each file's selected sheets into their destination sheets.
+
+        Source workbooks load on a small thread pool while this thread does all the
+        writing, in file order, so the output workbook needs no locking. At most
+        one workbook per worker is loaded ahead of the writer.
+        """
+        copied = 0
+        items = iter(groups.items())
+        workers = min(4, len(groups))
+        ex = ThreadPoolExecutor(max_workers=workers)
+        try:
+            pending = deque((ex.submit(self._load_source_workbook, path), targets)
+                            for path, targets in islice(items, workers))
+            while pending:
+                self._check_cancel()
+                future, targets = pending.popleft()
+                wbs = future.result()
+                for path, nxt in islice(items, 1):
+                    pending.append((ex.submit(self._load_source_workbook, path), nxt))
+
+                # style ids are workbook-wide, so one cache serves every sheet of this file
+                style_cache: Dict[Tuple[int, ...], Any] = {}
+                try:
+                    for src_name, ws_new in targets:
+                        self._check_cancel()
+                        self._copy_sheet_content(wbs[src_name], ws_new, style_cache)
+                        copied += 1
+                        self._progress_inc(1)
+                        self.status(f"Copied sheet {copied}/{len(self.source_sheets)}: {src_name}")
+                finally:
+                    wbs.close()
         finally:
-            wb.close()
+            # on error or cancel, drop loads that have not started yet
+            ex.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def _text_widths(headers: List[str], columns: Iterable[Iterable[Any]]) -> List[int]:
+        """Longest text per column, headers included."""
+        # falsy values (None, 0, '') never exceed the 10 character minimum
+        return [max(len(h), max(map(len, map(str, filter(None, values))), default=0))
+                for h, values in zip(headers, columns)]
 
-    def _write_cumulative(self, ws, rows: List[Dict[str, Any]]):
-        header_font = Font(bold=True, size=11)
-        header_fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
-        header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-        border_thin = Border(left=Side(style='thin'), right=Side(style='thin'),
-                             top=Side(style='thin'), bottom=Side(style='thin'))
+    @staticmethod
+    def _set_column_widths(ws, widths: List[int], max_width: int):
+        """Apply measured text widths (at least 10 characters).
+
+        Write-only sheets emit column widths with the sheet header, so this must run
+        before the first row is appended.
+        """
+        for c, w in enumerate(widths, 1):
+            ws.column_dimensions[get_column_letter(c)].width = min(max(w, 10) + 2, max_width)
+
+    def _write_cumulative(self, ws, cols: Columns, nums: Dict[str, np.ndarray]):
+        headers = self.common_headers
+        q = nums[_CANTITATE]
+
+        # output columns; only the two total columns are rebuilt, computing missing
+        # totals if possible, the rest are streamed straight from the extracted lists
+        columns = [cols[h] for h in headers]
+        for i_tot, tot_h, pu_h in ((headers.index(_TOT), _TOT, _PU), (headers.index(_TTOT), _TTOT, _TPU)):
+            product = q * nums[pu_h]
+            # only rows without a usable total but with quantity and unit price
+            missing = np.flatnonzero(np.isnan(nums[tot_h]) & ~np.isnan(product))
+            if len(missing):
+                filled = list(columns[i_tot])
+                for r, value in zip(missing.tolist(), product[missing].tolist()):
+                    filled[r] = value
+                columns[i_tot] = filled
+
+        self._set_column_widths(ws, self._text_widths(headers, columns), 30)
 
         # headers
-        for c, h in enumerate(self.common_headers, 1):
-            cell = ws.cell(row=1, column=c, value=h)
-            cell.font = header_font
-            cell.alignment = header_alignment
-            cell.border = border_thin
-            cell.fill = PatternFill(start_color="CCE5FF", end_color="CCE5FF", fill_type="solid") if h == 'Sheet' else header_fill
-
-        # rows
-        for r_idx, row in enumerate(rows, 2):
-            for c, h in enumerate(self.common_headers, 1):
-                val = row.get(h)
-                # compute missing totals if possible
-                if h == 'Pret total\n(RON)':
-                    pt = to_float(val)
-                    if pt is None:
-                        q = to_float(row.get('Cantitate'))
-                        pu = to_float(row.get('P.U.\n(RON)'))
-                        if q is not None and pu is not None:
-                            val = q * pu
-                elif h == 'Pret total Taxa\nVerde (RON)':
-                    pt = to_float(val)
-                    if pt is None:
-                        q = to_float(row.get('Cantitate'))
-                        pu = to_float(row.get('P.U. Taxa\nVerde (RON)'))
-                        if q is not None and pu is not None:
-                            val = q * pu
-                cell = ws.cell(row=r_idx, column=c, value=val)
-                cell.border = border_thin
-                if h in ['Cantitate']:
-                    if isinstance(val, (int, float)):
-                        cell.number_format = '#,##0'
-                if h in ['P.U.\n(RON)', 'Pret total\n(RON)', 'P.U. Taxa\nVerde (RON)', 'Pret total Taxa\nVerde (RON)']:
-                    if isinstance(val, (int, float)) and val != 0:
-                        cell.number_format = '#,##0.00'
-
-        # autosize
-        for c in range(1, len(self.common_headers) + 1):
-            letter = get_column_letter(c)
-            max_len = 10
-            for r in range(1, len(rows) + 2):
-                v = ws.cell(row=r, column=c).value
-                if v is not None:
-                    max_len = max(max_len, len(str(v)))
-            ws.column_dimensions[letter].width = min(max_len + 2, 30)
-
-    def _write_centralizator(self, ws, rows: List[Dict[str, Any]]):
-        header_font = Font(bold=True, size=11)
-        header_fill = PatternFill(start_color="90EE90", end_color="90EE90", fill_type="solid")
-        header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-        border_thin = Border(left=Side(style='thin'), right=Side(style='thin'),
-                             top=Side(style='thin'), bottom=Side(style='thin'))
+        ws.append(self._header_row(ws, headers, [self._HDR_FILL_BLUE if h == _SHEET else self._HDR_FILL_YELLOW
+                                                 for h in headers]))
+
+        # rows; styles resolved once per column
+        col_styles = self._column_styles(ws, self.common_headers, (_CANTITATE,))
+        for vals in zip(*columns):
+            ws.append(self._styled_row(ws, vals, col_styles))
+
+    def _write_centralizator(self, ws, df: pd.DataFrame):
+        headers = self.centralizator_headers
+        self._set_column_widths(ws, self._text_widths(headers, (df[h] for h in headers)), 35)
 
         # headers
-        for c, h in enumerate(self.centralizator_headers, 1):
-            cell = ws.cell(row=1, column=c, value=h)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
-            cell.border = border_thin
-
-        # data
-        for r_idx, row in enumerate(rows, 2):
-            for c, h in enumerate(self.centralizator_headers, 1):
-                val = row.get(h)
-                cell = ws.cell(row=r_idx, column=c, value=val)
-                cell.border = border_thin
-                if h in ['Cantitate', 'Stoc']:
-                    if isinstance(val, (int, float)):
-                        cell.number_format = '#,##0'
-                if h in ['P.U.\n(RON)', 'Pret total\n(RON)', 'P.U. Taxa\nVerde (RON)', 'Pret total Taxa\nVerde (RON)']:
-                    if isinstance(val, (int, float)) and val != 0:
-                        cell.number_format = '#,##0.00'
-                if h == 'Cod articol':
-                    cell.fill = PatternFill(start_color="F0F8FF", end_color="F0F8FF", fill_type="solid")
-                if h == 'Cod - Stoc':
-                    cell.fill = PatternFill(start_color="E6F3FF", end_color="E6F3FF", fill_type="solid")
-
-        # autosize
-        for c in range(1, len(self.centralizator_headers) + 1):
-            letter = get_column_letter(c)
-            max_len = 10
-            for r in range(1, len(rows) + 2):
-                v = ws.cell(row=r, column=c).value
-                if v is not None:
-                    max_len = max(max_len, len(str(v)))
-            ws.column_dimensions[letter].width = min(max_len + 2, 35)
-
-    def _copy_sheet_content(self, src_ws, dst_ws):
-        from copy import copy
-
-        for row in src_ws.iter_rows():
-            for cell in row:
-                if cell.value is not None:
-                    nc = dst_ws.cell(row=cell.row, column=cell.column, value=cell.value)
-                    if cell.has_style:
-                        nc.font = copy(cell.font)
-                        nc.fill = copy(cell.fill)
-                        nc.border = copy(cell.border)
-                        nc.alignment = copy(cell.alignment)
-                        nc.number_format = cell.number_format
-
-        # merged ranges
-        for mr in src_ws.merged_cells.ranges:
-            dst_ws.merge_cells(str(mr))
-
-        # dimensions
+        ws.append(self._header_row(ws, headers, [self._HDR_FILL_GREEN] * len(headers)))
+
+        # data; styles resolved once per column
+        col_styles = self._column_styles(ws, self.centralizator_headers, (_CANTITATE, _STOC),
+                                         fills={_COD: self._FILL_COD, _COD_STOC: self._FILL_COD_STOC})
+        for vals in dataframe_to_rows(df, index=False, header=False):
+            ws.append(self._styled_row(ws, vals, col_styles))
+
+    def _copy_sheet_content(self, src_ws, dst_ws, style_cache: Dict[Tuple[int, ...], Any]):
+        """Stream one sheet into a write-only destination.
+
+        style_cache maps source style ids to destination style arrays and may be
+        shared by sheets of the same source workbook.
+        """
+        # dimensions and panes are written with the sheet header, before any row
         for col_letter, dim in src_ws.column_dimensions.items():
             dst_ws.column_dimensions[col_letter].width = dim.width
         for row_num, dim in src_ws.row_dimensions.items():
             dst_ws.row_dimensions[row_num].height = dim.height
-
-        # panes and filters
         dst_ws.freeze_panes = src_ws.freeze_panes
-        if src_ws.auto_filter and src_ws.auto_filter.ref:
-            dst_ws.auto_filter.ref = src_ws.auto_filter.ref
+        merged = [str(mr) for mr in src_ws.merged_cells.ranges]
+        filter_ref = src_ws.auto_filter.ref if src_ws.auto_filter else None
+
+        # each distinct style combination is copied into the output workbook's
+        # style tables only once
+
+        # rows are streamed in order from A1, so cell positions are preserved
+        if len(src_ws.parent._cell_styles) <= 1:
+            # only the default style exists (typical of generated exports): values only
+            for row in src_ws.iter_rows(values_only=True):
+                dst_ws.append(row)
+        else:
+            for row in src_ws.iter_rows():
+                out: List[Any] = []
+                for cell in row:
+                    if cell.value is None:
+                        out.append(None)
+                    elif cell.has_style:
+                        st = cell._style
+                        key = (st.fontId, st.fillId, st.borderId, st.alignmentId, st.numFmtId)
+                        style = style_cache.get(key)
+                        if style is None:
+                            style = style_cache[key] = self._style_template(
+                                dst_ws, font=copy(cell.font), fill=copy(cell.fill), border=copy(cell.border),
+                                alignment=copy(cell.alignment), number_format=cell.number_format)
+                        nc = WriteOnlyCell(dst_ws, value=cell.value)
+                        nc._style = copy(style)
+                        out.append(nc)
+                    else:
+                        out.append(cell.value)
+                dst_ws.append(out)
+
+        # merged ranges and filters are written with the sheet footer
+        for ref in merged:
+            dst_ws.merged_cells.add(ref)
+        if filter_ref:
+            dst_ws.auto_filter.ref = filter_ref
+
+# --------------------------- Workers ---------------------------
+
+def _extract_file_worker(file_path: str, with_stock: bool):
+    """Process-pool entry point; the GUI callbacks and cancel event cannot be pickled."""
+    processor = ExcelProcessor(cancel_event=threading.Event(),
+                               status_cb=lambda m: None,
+                               progress_cb=lambda kind, val: None)
+    return processor._extract_data_from_file(file_path, with_stock)
 
 # --------------------------- Entrypoint ---------------------------
 
 def main():
+    # required for worker processes in the frozen (PyInstaller) build
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = ExcelProcessorGUI(root)
 